@@ -1,17 +1,24 @@
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import yfinance as yf
+from openpyxl import Workbook
 import time
 import os
 import sys
-import json
+import orjson
 import webbrowser
 import threading
+import queue
 import re
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, Union, NamedTuple, Iterator
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # ==============================
@@ -26,8 +33,9 @@ YEAR = "2026"
 # Configuration
 # ==============================
 RATE_LIMIT_SLEEP = 60
-NORMAL_SLEEP = 12
+DEFAULT_REQUESTS_PER_MINUTE = 5  # Alpha Vantage free tier
 MAX_RETRIES = 3
+SETTINGS_SAVE_DELAY = 0.5  # Seconds to coalesce settings writes
 CACHE_TTL_HOURS = 24
 CACHE_MAX_AGE_DAYS = 7  # Clean cache files older than 7 days
 API_TIMEOUT = 15
@@ -37,9 +45,23 @@ APP_WINDOW_WIDTH = 900
 APP_WINDOW_HEIGHT = 650
 APP_WINDOW_MIN_WIDTH = 750
 APP_WINDOW_MIN_HEIGHT = 550
+EXPORT_FORMATS = ["xlsx", "parquet", "feather"]
+LOG_FLUSH_DELAY_MS = 50
 
 # Regex for valid stock symbols (1-5 uppercase letters)
 VALID_SYMBOL_PATTERN = r'^[A-Z]{1,5}$'
+VALID_SYMBOL_RE = re.compile(VALID_SYMBOL_PATTERN)
+
+# Regex for the years field while typing (empty or 1-50)
+VALID_YEARS_INPUT_PATTERN = r'(?:[1-9]|[1-4][0-9]|50)?'
+VALID_YEARS_INPUT_RE = re.compile(VALID_YEARS_INPUT_PATTERN)
+
+# Alpha Vantage endpoint for each financial statement
+STATEMENT_FUNCTIONS = {
+    "income_statement": "INCOME_STATEMENT",
+    "balance_sheet": "BALANCE_SHEET",
+    "cash_flow": "CASH_FLOW"
+}
 
 # ==============================
 # App directory
@@ -63,7 +85,8 @@ SETTINGS_FILE = os.path.join(APP_DIR, "settings.json")
 DEFAULT_SETTINGS = {
     "api_key": "",
     "api_key_validated": False,
-    "save_directory": APP_DIR
+    "save_directory": APP_DIR,
+    "requests_per_minute": DEFAULT_REQUESTS_PER_MINUTE
 }
 
 
@@ -72,25 +95,40 @@ def load_settings() -> Dict:
     if not os.path.exists(SETTINGS_FILE):
         return DEFAULT_SETTINGS.copy()
     try:
-        with open(SETTINGS_FILE, "r") as f:
-            data = json.load(f)
+        with open(SETTINGS_FILE, "rb") as f:
+            data = orjson.loads(f.read())
             return {**DEFAULT_SETTINGS, **data}
     except Exception as e:
         print(f"Error loading settings: {e}")
         return DEFAULT_SETTINGS.copy()
 
 
-def save_settings(settings: Dict) -> None:
-    """Save settings to JSON file."""
+def write_settings(settings: Dict) -> None:
+    """Write settings to JSON file."""
     try:
-        with open(SETTINGS_FILE, "w") as f:
-            json.dump(settings, f, indent=4)
+        with open(SETTINGS_FILE, "wb") as f:
+            f.write(orjson.dumps(settings, option=orjson.OPT_INDENT_2))
     except Exception as e:
         print(f"Error saving settings: {e}")
 
 
+def save_settings(settings: Dict) -> None:
+    """
+    Schedule a settings write, coalescing rapid successive saves into one.
+    Callers must hold settings_lock.
+    """
+    global settings_save_timer
+    if settings_save_timer is not None:
+        settings_save_timer.cancel()
+    settings_save_timer = threading.Timer(
+        SETTINGS_SAVE_DELAY, write_settings, args=(dict(settings),)
+    )
+    settings_save_timer.start()
+
+
 settings = load_settings()
 settings_lock = threading.Lock()
+settings_save_timer: Optional[threading.Timer] = None
 
 
 def get_api_key() -> str:
@@ -107,58 +145,125 @@ def set_api_key(key: str, validated: bool = False) -> None:
         save_settings(settings)
 
 
+# ==============================
+# Rate Limiting
+# ==============================
+# Set when the app is closing so worker threads stop waiting and exit
+shutdown_event = threading.Event()
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces out calls to a requests-per-minute budget."""
+    
+    def __init__(self, requests_per_minute: float):
+        self.min_interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.last_call_ts = 0.0
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> bool:
+        """
+        Block only as long as needed to keep calls min_interval apart.
+        Returns False without waiting further if the app is shutting down.
+        """
+        with self.lock:
+            wait = self.min_interval - (time.monotonic() - self.last_call_ts)
+            if wait > 0 and shutdown_event.wait(wait):
+                return False
+            if shutdown_event.is_set():
+                return False
+            self.last_call_ts = time.monotonic()
+            return True
+
+
+rate_limiter = RateLimiter(settings.get("requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE))
+
+
 # ==============================
 # Cache Utilities
 # ==============================
-def get_cache_path(symbol: str, function_name: str, period: str, year: str) -> str:
+def get_cache_path(symbol: str, function_name: str, period: str, year: str,
+                   extension: str = "json") -> str:
     """Get cache file path for a specific query."""
-    filename = f"{symbol}_{function_name}_{period}_{year}.json"
+    filename = f"{symbol}_{function_name}_{period}_{year}.{extension}"
     return os.path.join(CACHE_DIR, filename)
 
 
+def is_legacy_cache_file(filename: str) -> bool:
+    """Check if a file is a statement cache entry in the old JSON format."""
+    return filename.endswith(".json") and any(
+        f"_{func}_" in filename for func in STATEMENT_FUNCTIONS.values()
+    )
+
+
 def is_cache_valid(path: str) -> bool:
     """Check if cache file exists and is not expired."""
-    if not os.path.exists(path):
+    try:
+        age_seconds = time.time() - os.stat(path).st_mtime
+    except FileNotFoundError:
         return False
-    age_seconds = time.time() - os.path.getmtime(path)
     return age_seconds < CACHE_TTL_HOURS * 3600
 
 
-def load_from_cache(symbol: str, function_name: str, period: str, year: str) -> Optional[List]:
+def load_from_cache(symbol: str, function_name: str, period: str, year: str) -> Optional[Union[List, Dict]]:
     """Load data from cache if valid."""
     path = get_cache_path(symbol, function_name, period, year)
     if not is_cache_valid(path):
         return None
     try:
-        with open(path, "r") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     except Exception as e:
         print(f"Error loading cache: {e}")
         return None
 
 
-def save_to_cache(symbol: str, function_name: str, period: str, year: str, data: List) -> None:
+def save_to_cache(symbol: str, function_name: str, period: str, year: str, data: Union[List, Dict]) -> None:
     """Save data to cache."""
     path = get_cache_path(symbol, function_name, period, year)
     try:
-        with open(path, "w") as f:
-            json.dump(data, f)
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data))
+    except Exception as e:
+        print(f"Error saving to cache: {e}")
+
+
+def load_frame_from_cache(symbol: str, function_name: str, period: str, year: str) -> Optional[pd.DataFrame]:
+    """Load a DataFrame from the Feather cache if valid."""
+    path = get_cache_path(symbol, function_name, period, year, extension="feather")
+    if not is_cache_valid(path):
+        return None
+    try:
+        return pd.read_feather(path)
+    except Exception as e:
+        print(f"Error loading cache: {e}")
+        return None
+
+
+def save_frame_to_cache(symbol: str, function_name: str, period: str, year: str, df: pd.DataFrame) -> None:
+    """Save a DataFrame to the Feather cache."""
+    path = get_cache_path(symbol, function_name, period, year, extension="feather")
+    try:
+        df.reset_index(drop=True).to_feather(path)
     except Exception as e:
         print(f"Error saving to cache: {e}")
 
 
 def clean_old_cache(max_age_days: int = CACHE_MAX_AGE_DAYS) -> None:
-    """Remove cache files older than max_age_days."""
+    """Remove cache files older than max_age_days and legacy JSON statement caches."""
     try:
         current_time = time.time()
         max_age_seconds = max_age_days * 24 * 3600
         
-        for file in os.listdir(CACHE_DIR):
-            file_path = os.path.join(CACHE_DIR, file)
-            if os.path.isfile(file_path):
-                file_age = current_time - os.path.getmtime(file_path)
-                if file_age > max_age_seconds:
-                    os.remove(file_path)
+        with os.scandir(CACHE_DIR) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    file_age = current_time - entry.stat().st_mtime
+                    if file_age > max_age_seconds or is_legacy_cache_file(entry.name):
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            # Already removed by a concurrent sweep
+                            pass
     except Exception as e:
         print(f"Error cleaning cache: {e}")
 
@@ -168,7 +273,7 @@ def clean_old_cache(max_age_days: int = CACHE_MAX_AGE_DAYS) -> None:
 # ==============================
 def is_valid_symbol(symbol: str) -> bool:
     """Validate stock symbol format."""
-    return bool(re.match(VALID_SYMBOL_PATTERN, symbol.upper()))
+    return bool(VALID_SYMBOL_RE.match(symbol.upper()))
 
 
 def validate_years_count(years: int) -> bool:
@@ -179,29 +284,65 @@ def validate_years_count(years: int) -> bool:
 # ==============================
 # Alpha Vantage API
 # ==============================
-def alpha_vantage_request(function_name: str, symbol: str, api_key: str) -> Tuple[Optional[Dict], Optional[str]]:
+def create_http_session() -> requests.Session:
+    """Create a pooled HTTP session that retries transient server errors."""
+    session = requests.Session()
+    # Only retry 429/5xx responses; connection and read failures are reported
+    # at once so API key validation on the UI thread stays within API_TIMEOUT
+    retry = Retry(
+        total=3,
+        connect=0,
+        read=0,
+        other=0,
+        status=3,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    return session
+
+
+# Shared session so TCP/TLS connections are reused across requests
+http_session = create_http_session()
+
+
+class ApiErrorKind(Enum):
+    """Categories of Alpha Vantage request failures."""
+    RATE_LIMIT = "rate_limit"
+    INVALID = "invalid"
+    NETWORK = "network"
+
+
+class ApiError(NamedTuple):
+    """Error returned by alpha_vantage_request."""
+    kind: ApiErrorKind
+    message: str
+
+
+def alpha_vantage_request(function_name: str, symbol: str, api_key: str) -> Tuple[Optional[Dict], Optional[ApiError]]:
     """Make request to Alpha Vantage API with error handling."""
     url = "https://www.alphavantage.co/query"
     params = {"function": function_name, "symbol": symbol, "apikey": api_key}
 
     try:
-        response = requests.get(url, params=params, timeout=API_TIMEOUT)
+        response = http_session.get(url, params=params, timeout=API_TIMEOUT)
         data = response.json()
         
         if "Note" in data:
-            return None, "API rate limit reached. Please wait 60 seconds."
+            return None, ApiError(ApiErrorKind.RATE_LIMIT, "API rate limit reached. Please wait 60 seconds.")
         if "Error Message" in data:
-            return None, "Invalid API key or request."
+            return None, ApiError(ApiErrorKind.INVALID, "Invalid API key or request.")
         if "Information" in data:
-            return None, "API request throttled. Please wait."
+            return None, ApiError(ApiErrorKind.RATE_LIMIT, "API request throttled. Please wait.")
         
         return data, None
     except requests.Timeout:
-        return None, "Request timeout. Please check your connection."
+        return None, ApiError(ApiErrorKind.NETWORK, "Request timeout. Please check your connection.")
     except requests.ConnectionError:
-        return None, "Connection error. Please check your internet connection."
+        return None, ApiError(ApiErrorKind.NETWORK, "Connection error. Please check your internet connection.")
     except Exception as e:
-        return None, f"Connection error: {str(e)}"
+        return None, ApiError(ApiErrorKind.NETWORK, f"Connection error: {str(e)}")
 
 
 def validate_api_key(api_key: str) -> Tuple[bool, str]:
@@ -213,15 +354,15 @@ def validate_api_key(api_key: str) -> Tuple[bool, str]:
         return False, "API key cannot be empty."
     
     try:
-        # Use TIME_SERIES_DAILY which is a reliable endpoint for validation
+        # Use SYMBOL_SEARCH which returns a small payload for validation
         url = "https://www.alphavantage.co/query"
         params = {
-            "function": "TIME_SERIES_DAILY",
-            "symbol": "IBM",
+            "function": "SYMBOL_SEARCH",
+            "keywords": "AAPL",
             "apikey": api_key.strip()
         }
         
-        response = requests.get(url, params=params, timeout=API_TIMEOUT)
+        response = http_session.get(url, params=params, timeout=API_TIMEOUT)
         data = response.json()
         
         # Check for errors
@@ -236,8 +377,8 @@ def validate_api_key(api_key: str) -> Tuple[bool, str]:
         if "Information" in data:
             return False, "API is temporarily throttled. Please try again in a moment."
         
-        # If we got time series data, the key is valid
-        if "Time Series (Daily)" in data or "Meta Data" in data:
+        # If we got search results, the key is valid
+        if "bestMatches" in data:
             return True, "API key is valid!"
         
         # If we got here without errors or rate limits, key is likely valid
@@ -255,6 +396,29 @@ def validate_api_key(api_key: str) -> Tuple[bool, str]:
 # ==============================
 # Fetch Financial Statements
 # ==============================
+def reports_to_columns(reports: List[Dict]) -> Dict[str, List]:
+    """Pivot a list of report records into a dict of column lists."""
+    columns = dict.fromkeys(key for report in reports for key in report)
+    return {key: [report.get(key) for report in reports] for key in columns}
+
+
+def reports_to_dataframe(columns: Dict[str, List]) -> pd.DataFrame:
+    """Build a statement DataFrame from column lists and convert its values to numbers."""
+    df = pd.DataFrame(columns)
+    numeric_columns = df.columns.drop("fiscalDateEnding", errors="ignore")
+    df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors="coerce")
+    return df
+
+
+def latest_reports(df: pd.DataFrame, limit: int) -> pd.DataFrame:
+    """Return the last 'limit' reports in chronological order."""
+    dates = df["fiscalDateEnding"]
+    if dates.is_monotonic_decreasing:
+        # Alpha Vantage lists reports newest first, so slicing is enough
+        return df.iloc[:limit].iloc[::-1]
+    return df.sort_values("fiscalDateEnding").tail(limit)
+
+
 def fetch_financial_statements(
     symbol: str,
     api_key: str,
@@ -277,110 +441,116 @@ def fetch_financial_statements(
     Returns:
         Dictionary with financial statement DataFrames
     """
-    function_map = {
-        "income_statement": "INCOME_STATEMENT",
-        "balance_sheet": "BALANCE_SHEET",
-        "cash_flow": "CASH_FLOW"
-    }
-
     financials = {}
-    total_steps = len(function_map)
+    total_steps = len(STATEMENT_FUNCTIONS)
     completed_steps = 0
     year = str(datetime.now().year)
+    period_lower = period.lower()
+    reports_key = "quarterlyReports" if period_lower == "quarter" else "annualReports"
+    pretty_names = {key: key.replace("_", " ") for key in STATEMENT_FUNCTIONS}
     
     # Calculate limit: for quarters, multiply by 4; for annual, use years as-is
-    if period.lower() == "quarter":
+    if period_lower == "quarter":
         limit = years * 4  # 4 quarters per year
     else:
         limit = years  # 1 annual report per year
 
-    for key, func in function_map.items():
-        # Try to load from cache
-        cached = load_from_cache(symbol, func, period.lower(), year)
-        if cached:
-            if log_callback:
-                log_callback(f"Loaded {key.replace('_', ' ')} from cache ✔️\n")
-            
-            try:
-                df = pd.DataFrame(cached)
-                if not df.empty and "fiscalDateEnding" in df.columns:
-                    # Sort by date and get the last 'limit' entries
-                    df = df.sort_values("fiscalDateEnding").tail(limit)
-                financials[key] = df
-            except Exception as e:
-                print(f"Error processing cached data: {e}")
-                financials[key] = pd.DataFrame()
-            
-            completed_steps += 1
-            if progress_callback:
-                progress_callback((completed_steps / total_steps) * 100)
-            continue
-
-        # Fetch from API with retries
+    def fetch_statement(key: str, func: str) -> pd.DataFrame:
+        """Fetch a single statement from the API with retries."""
+        label = pretty_names[key].capitalize()
         retries = 0
         while retries <= MAX_RETRIES:
-            if log_callback:
-                log_callback(f"Fetching {key.replace('_', ' ')}...\n")
-            
             try:
+                if not rate_limiter.acquire():
+                    return pd.DataFrame()
+                
+                if log_callback:
+                    log_callback(f"Fetching {pretty_names[key]}...\n")
                 data, error = alpha_vantage_request(func, symbol, api_key)
                 
                 if error:
+                    # Rate limits clear up after a wait; anything else is fatal
+                    if error.kind is ApiErrorKind.RATE_LIMIT and retries < MAX_RETRIES:
+                        retries += 1
+                        if log_callback:
+                            log_callback(f"⚠️ {label}: Rate limit hit. Waiting {RATE_LIMIT_SLEEP}s...\n")
+                        if shutdown_event.wait(RATE_LIMIT_SLEEP):
+                            return pd.DataFrame()
+                        continue
+                    
                     if log_callback:
-                        log_callback(f"{error}\n")
-                    financials[key] = pd.DataFrame()
-                    break
-                
-                if "Note" in data:
-                    retries += 1
-                    if log_callback:
-                        log_callback(f"⚠️ Rate limit hit. Waiting {RATE_LIMIT_SLEEP}s...\n")
-                    time.sleep(RATE_LIMIT_SLEEP)
-                    continue
-                
-                if "Error Message" in data:
-                    if log_callback:
-                        log_callback("API error returned by Alpha Vantage.\n")
-                    financials[key] = pd.DataFrame()
-                    break
+                        log_callback(f"{label}: {error.message}\n")
+                    return pd.DataFrame()
 
                 # Extract reports based on period
-                reports_key = "quarterlyReports" if period.lower() == "quarter" else "annualReports"
                 reports = data.get(reports_key, [])
                 
                 if not reports:
                     if log_callback:
                         log_callback(f"No {key} data available for {symbol}.\n")
-                    financials[key] = pd.DataFrame()
-                    break
+                    return pd.DataFrame()
                 
                 # Save to cache and process
-                save_to_cache(symbol, func, period.lower(), year, reports)
-                df = pd.DataFrame(reports)
+                df = reports_to_dataframe(reports_to_columns(reports))
+                save_frame_to_cache(symbol, func, period_lower, year, df)
                 if not df.empty:
-                    # Sort by fiscal date and get the last 'limit' entries
-                    df = df.sort_values("fiscalDateEnding").tail(limit)
-                financials[key] = df
+                    # Keep the last 'limit' entries in date order
+                    df = latest_reports(df, limit)
                 
                 if log_callback:
                     record_count = len(df)
-                    log_callback(f"✔️ Retrieved {record_count} {period} records for {key.replace('_', ' ')}\n")
+                    log_callback(f"✔️ Retrieved {record_count} {period} records for {pretty_names[key]}\n")
                 
-                break
+                return df
 
             except Exception as e:
                 if log_callback:
-                    log_callback(f"Request failed: {str(e)}\n")
+                    log_callback(f"{label}: Request failed: {str(e)}\n")
+                return pd.DataFrame()
+
+        return pd.DataFrame()
+
+    pending = {}
+    for key, func in STATEMENT_FUNCTIONS.items():
+        # Try to load from cache
+        cached = load_frame_from_cache(symbol, func, period_lower, year)
+        if cached is not None and not cached.empty:
+            if log_callback:
+                log_callback(f"Loaded {pretty_names[key]} from cache ✔️\n")
+            
+            try:
+                df = cached
+                if "fiscalDateEnding" in df.columns:
+                    # Keep the last 'limit' entries in date order
+                    df = latest_reports(df, limit)
+                financials[key] = df
+            except Exception as e:
+                print(f"Error processing cached data: {e}")
                 financials[key] = pd.DataFrame()
-                break
+            
+            completed_steps += 1
+            if progress_callback:
+                progress_callback((completed_steps / total_steps) * 100)
+            continue
 
-        completed_steps += 1
-        if progress_callback:
-            progress_callback((completed_steps / total_steps) * 100)
-        
-        time.sleep(NORMAL_SLEEP)
+        pending[key] = func
+
+    # Fetch the remaining statements from the API concurrently
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {
+                executor.submit(fetch_statement, key, func): key
+                for key, func in pending.items()
+            }
+            for future in as_completed(futures):
+                financials[futures[future]] = future.result()
+                
+                completed_steps += 1
+                if progress_callback:
+                    progress_callback((completed_steps / total_steps) * 100)
 
-    return financials
+    # Keep statements in their canonical order regardless of completion order
+    return {key: financials[key] for key in STATEMENT_FUNCTIONS}
 
 
 # ==============================
@@ -388,6 +558,11 @@ def fetch_financial_statements(
 # ==============================
 def fetch_year_end_closing_prices_yf(symbol: str, years: List[int]) -> Dict[str, Optional[float]]:
     """Fetch year-end closing prices using yfinance."""
+    year_range = f"{min(years)}_{max(years)}"
+    cached = load_from_cache(symbol, "YF_YEAREND", "annual", year_range)
+    if cached:
+        return cached
+    
     try:
         start_date = datetime(min(years) - 1, 1, 1)
         end_date = datetime(max(years) + 1, 1, 1)
@@ -397,15 +572,14 @@ def fetch_year_end_closing_prices_yf(symbol: str, years: List[int]) -> Dict[str,
         if data.empty:
             return {}
         
-        closing_prices = {}
-        for year in years:
-            year_data = data[data.index.year == year]
-            if not year_data.empty:
-                last_day = year_data.index.max()
-                closing_prices[str(year)] = round(year_data.loc[last_day]["Close"], 2)
-            else:
-                closing_prices[str(year)] = None
+        # Last close of each calendar year in a single pass
+        yearly = data["Close"].groupby(data.index.year).last().round(2)
         
+        closing_prices = {
+            str(year): float(yearly[year]) if year in yearly.index else None
+            for year in years
+        }
+        save_to_cache(symbol, "YF_YEAREND", "annual", year_range, closing_prices)
         return closing_prices
     except Exception as e:
         print(f"Error fetching year-end prices: {e}")
@@ -415,63 +589,208 @@ def fetch_year_end_closing_prices_yf(symbol: str, years: List[int]) -> Dict[str,
 # ==============================
 # Save to Excel
 # ==============================
-def save_to_excel(financials: Dict[str, pd.DataFrame], 
-                  closing_prices: Dict[str, float], 
-                  symbol: str) -> bool:
-    """Save financial data to Excel file."""
+# Prefer xlsxwriter for speed; fall back to openpyxl when it isn't installed
+try:
+    import xlsxwriter
+    EXCEL_ENGINE = "xlsxwriter"
+except ImportError:
+    xlsxwriter = None
+    EXCEL_ENGINE = "openpyxl"
+
+
+def show_message(kind: str, title: str, message: str) -> None:
+    """Show an "info", "warning" or "error" message box."""
+    getattr(messagebox, f"show{kind}")(title, message)
+
+
+def get_export_directory(has_data: bool, message_callback=None) -> Optional[str]:
+    """Return the save directory if it exists and there is data to export."""
+    notify = message_callback or show_message
     base_dir = settings.get("save_directory", APP_DIR)
     
     if not os.path.isdir(base_dir):
-        messagebox.showerror("Invalid Folder", "Save directory does not exist.")
-        return False
+        notify("error", "Invalid Folder", "Save directory does not exist.")
+        return None
     
     # Validate that we have data to save
-    has_data = any(not df.empty for df in financials.values())
     if not has_data:
-        messagebox.showwarning("No Data", "No financial data to export. Please run analysis first.")
+        notify("warning", "No Data", "No financial data to export. Please run analysis first.")
+        return None
+    
+    return base_dir
+
+
+def frame_rows(df: pd.DataFrame, index: bool = True) -> Iterator[tuple]:
+    """Yield a DataFrame's header row followed by its data rows."""
+    # Missing values become empty cells rather than NaN
+    if df.isna().to_numpy().any():
+        df = df.astype(object).where(df.notna(), None)
+    
+    if index:
+        yield (df.index.name, *df.columns)
+    else:
+        yield tuple(df.columns)
+    yield from df.itertuples(index=index, name=None)
+
+
+def write_sheets_xlsxwriter(filename: str, sheets: List[Tuple[str, pd.DataFrame, bool]]) -> None:
+    """Stream (title, DataFrame, index) sheets row by row into an xlsxwriter workbook."""
+    # constant_memory flushes each finished row, so rows must be written in order
+    with xlsxwriter.Workbook(filename, {"constant_memory": True}) as wb:
+        for title, df, index in sheets:
+            ws = wb.add_worksheet(title)
+            for row_num, row in enumerate(frame_rows(df, index=index)):
+                ws.write_row(row_num, 0, row)
+
+
+def write_sheets_openpyxl(filename: str, sheets: List[Tuple[str, pd.DataFrame, bool]]) -> None:
+    """Stream (title, DataFrame, index) sheets into a write-only openpyxl workbook."""
+    wb = Workbook(write_only=True)
+    for title, df, index in sheets:
+        ws = wb.create_sheet(title=title)
+        for row in frame_rows(df, index=index):
+            ws.append(row)
+    wb.save(filename)
+
+
+def prepare_statement_sheet(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Transpose a statement so years are columns and zero missing values.
+    Values are already numeric; reports_to_dataframe converts them at fetch time.
+    """
+    if "fiscalDateEnding" in df.columns:
+        # Transpose the raw float array to skip pandas' block rebuild
+        values = df.drop(columns="fiscalDateEnding")
+        df_t = pd.DataFrame(
+            values.to_numpy(dtype=np.float64).T,
+            index=values.columns,
+            columns=df["fiscalDateEnding"].str[:4]
+        )
+    else:
+        df_t = df.transpose()
+    
+    return df_t.fillna(0.0)
+
+
+def closing_prices_frame(closing_prices: Dict[str, Optional[float]]) -> pd.DataFrame:
+    """Build a typed Year / Closing Price frame; missing prices become NaN."""
+    cp_df = pd.Series(closing_prices, name="Closing Price", dtype="float64").rename_axis("Year").reset_index()
+    cp_df["Year"] = cp_df["Year"].astype(int)
+    return cp_df
+
+
+def save_to_excel(financials: Dict[str, pd.DataFrame], 
+                  closing_prices: Dict[str, float], 
+                  symbol: str,
+                  cache: Optional[Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]] = None,
+                  message_callback=None) -> bool:
+    """
+    Save financial data to Excel file.
+    Prepared statement sheets are stored in and reused from cache when given,
+    as (source frame, prepared sheet) pairs so stale entries are never reused.
+    """
+    notify = message_callback or show_message
+    statements = {name: df for name, df in financials.items() if len(df.index) > 0}
+    base_dir = get_export_directory(bool(statements), message_callback)
+    if base_dir is None:
         return False
     
     filename = os.path.join(base_dir, f"{symbol}_financials.xlsx")
     
     try:
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            # Save financial statements
-            for sheet_name, df in financials.items():
-                if df.empty:
-                    continue
-                
-                try:
-                    if "fiscalDateEnding" in df.columns:
-                        df_t = df.set_index("fiscalDateEnding").transpose()
-                        df_t.columns = [c[:4] for c in df_t.columns]
-                    else:
-                        df_t = df.transpose()
-                    
-                    # Convert to numeric and handle missing values
-                    df_t = df_t.replace([None, "None", pd.NA], 0)
-                    df_t = df_t.apply(pd.to_numeric, errors="coerce").fillna(0)
-                    
-                    df_t.to_excel(writer, sheet_name=sheet_name.replace("_", " ").title())
-                except Exception as e:
-                    print(f"Error writing {sheet_name}: {e}")
-                    continue
+        sheets = []
+        
+        # Prepare financial statements, reusing sheets from earlier exports
+        prepared = {}
+        if cache is not None:
+            for name, df in statements.items():
+                source, df_t = cache.get(name, (None, None))
+                if source is df:
+                    prepared[name] = df_t
+        to_prepare = [name for name in statements if name not in prepared]
+        
+        if to_prepare:
+            with ThreadPoolExecutor(max_workers=len(to_prepare)) as executor:
+                futures = {
+                    name: executor.submit(prepare_statement_sheet, statements[name])
+                    for name in to_prepare
+                }
+                for name, future in futures.items():
+                    try:
+                        prepared[name] = future.result()
+                    except Exception as e:
+                        print(f"Error preparing {name}: {e}")
             
-            # Save closing prices
-            if closing_prices:
-                cp_df = pd.DataFrame(closing_prices.items(), columns=["Year", "Closing Price"])
-                cp_df.to_excel(writer, sheet_name="Year-End Closing Prices", index=False)
+            if cache is not None:
+                cache.update({name: (statements[name], df_t) for name, df_t in prepared.items()})
+        
+        for name in statements:
+            if name in prepared:
+                sheets.append((name.replace("_", " ").title(), prepared[name], True))
+        
+        # Prepare closing prices
+        if closing_prices:
+            cp_df = closing_prices_frame(closing_prices)
+            sheets.append(("Year-End Closing Prices", cp_df, False))
+        
+        if EXCEL_ENGINE == "xlsxwriter":
+            write_sheets_xlsxwriter(filename, sheets)
+        else:
+            write_sheets_openpyxl(filename, sheets)
+        
+        notify("info", "Saved", f"File saved successfully:\n\n{filename}")
+        return True
+    
+    except Exception as e:
+        notify("error", "Save Error", f"Failed to save file:\n\n{str(e)}")
+        return False
+
+
+# ==============================
+# Save to Parquet / Feather
+# ==============================
+def save_to_columnar(financials: Dict[str, pd.DataFrame],
+                     closing_prices: Dict[str, float],
+                     symbol: str,
+                     file_format: str = "parquet",
+                     message_callback=None) -> bool:
+    """Save financial data as one Parquet or Feather file per statement."""
+    notify = message_callback or show_message
+    frames = {name: df for name, df in financials.items() if len(df.index) > 0}
+    base_dir = get_export_directory(bool(frames), message_callback)
+    if base_dir is None:
+        return False
+    
+    output_dir = os.path.join(base_dir, f"{symbol}_financials")
+    
+    try:
+        os.makedirs(output_dir, exist_ok=True)
         
-        messagebox.showinfo("Saved", f"File saved successfully:\n\n{filename}")
+        if closing_prices:
+            frames["year_end_closing_prices"] = closing_prices_frame(closing_prices)
+        
+        for name, df in frames.items():
+            path = os.path.join(output_dir, f"{name}.{file_format}")
+            if file_format == "feather":
+                df.reset_index(drop=True).to_feather(path)
+            else:
+                df.to_parquet(path, engine="pyarrow", compression="zstd", index=False)
+        
+        notify("info", "Saved", f"Files saved successfully:\n\n{output_dir}")
         return True
     
     except Exception as e:
-        messagebox.showerror("Save Error", f"Failed to save file:\n\n{str(e)}")
+        notify("error", "Save Error", f"Failed to save files:\n\n{str(e)}")
         return False
 
 
 # ==============================
 # Main Application Class
 # ==============================
+# Shared pool for work that can overlap the statement fetch
+background_executor = ThreadPoolExecutor(max_workers=2)
+
+
 class FinancialDataApp:
     """Main application class for Financial Data Extractor."""
     
@@ -485,7 +804,15 @@ class FinancialDataApp:
         self.financials: Optional[Dict[str, pd.DataFrame]] = None
         self.closing_prices: Optional[Dict[str, float]] = None
         self.current_symbol: Optional[str] = None
+        self.has_financials = False
+        self.export_cache: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+        self.export_running = False
         self.analysis_running = False
+        self.last_progress = 0.0
+        self.api_key_valid: bool = settings.get("api_key_validated", False)
+        self.log_queue: queue.Queue = queue.Queue()
+        self.log_lock = threading.Lock()
+        self.log_flush_pending = False
         
         # Setup theme
         ctk.set_appearance_mode("dark")
@@ -561,24 +888,33 @@ class FinancialDataApp:
         # Buttons
         button_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
         button_frame.grid(row=4, column=0, columnspan=2, pady=15)
-        button_frame.columnconfigure((0, 1), weight=1)
+        button_frame.columnconfigure((0, 1, 2), weight=1)
         
         self.run_button = ctk.CTkButton(
             button_frame,
             text="Run Analysis",
             command=self.run_analysis,
-            state="normal" if settings.get("api_key_validated") else "disabled"
+            state="normal" if self.api_key_valid else "disabled"
         )
         self.run_button.grid(row=0, column=0, padx=10)
         
         self.save_button = ctk.CTkButton(
             button_frame,
-            text="Export to Excel",
-            command=self.save_to_excel,
+            text="Export",
+            command=self.export_data,
             state="disabled"
         )
         self.save_button.grid(row=0, column=1, padx=10)
         
+        self.format_var = ctk.StringVar(value=EXPORT_FORMATS[0])
+        self.format_menu = ctk.CTkOptionMenu(
+            button_frame,
+            variable=self.format_var,
+            values=EXPORT_FORMATS,
+            width=100
+        )
+        self.format_menu.grid(row=0, column=2, padx=10)
+        
         # Text output and progress
         text_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
         text_frame.grid(row=5, column=0, columnspan=2, sticky="nsew", pady=10)
@@ -609,26 +945,23 @@ class FinancialDataApp:
     
     def validate_years_input(self, value: str) -> bool:
         """Validate years input field."""
-        if value == "":
-            return True
-        try:
-            return validate_years_count(int(value))
-        except ValueError:
-            return False
+        return VALID_YEARS_INPUT_RE.fullmatch(value) is not None
     
     def update_button_states(self) -> None:
         """Update button enabled/disabled states based on app state."""
-        api_key_valid = settings.get("api_key_validated", False)
-        has_data = self.financials is not None and any(
-            not df.empty for df in self.financials.values()
-        )
+        busy = self.analysis_running or self.export_running
+        can_run = self.api_key_valid and not busy
+        can_save = self.has_financials and not busy
         
-        self.run_button.configure(state="normal" if api_key_valid else "disabled")
-        self.save_button.configure(state="normal" if has_data else "disabled")
+        self.run_button.configure(state="normal" if can_run else "disabled")
+        self.save_button.configure(state="normal" if can_save else "disabled")
     
     def run_analysis(self) -> None:
         """Start financial data analysis."""
-        if not settings.get("api_key"):
+        if self.analysis_running or self.export_running:
+            return
+        
+        if not self.api_key_valid:
             messagebox.showwarning(
                 "API Key Missing",
                 "Please enter your Alpha Vantage API key in Settings."
@@ -666,6 +999,7 @@ class FinancialDataApp:
         self.run_button.configure(state="disabled")
         self.save_button.configure(state="disabled")
         self.progress_bar.set(0)
+        self.last_progress = 0.0
         self.result_text.delete("1.0", "end")
         self.disable_inputs()
         
@@ -684,11 +1018,19 @@ class FinancialDataApp:
             current_year = datetime.now().year
             years_list = list(range(current_year - years + 1, current_year + 1))
             
+            # Prepared export sheets belong to the previous analysis
+            self.export_cache = {}
+            
+            # Prices come from Yahoo Finance, so fetch them alongside the statements
+            prices_future = background_executor.submit(
+                fetch_year_end_closing_prices_yf, symbol, years_list
+            )
+            
             period_display = "quarterly" if period == "quarter" else "annual"
             self.safe_log(f"Fetching {period_display} financial data for {symbol}...\n\n")
             
-            # Clean old cache periodically
-            clean_old_cache()
+            # Clean old cache periodically, without delaying the first request
+            threading.Thread(target=clean_old_cache, daemon=True).start()
             
             # Fetch financial statements (pass years count, not limit)
             self.financials = fetch_financial_statements(
@@ -699,9 +1041,10 @@ class FinancialDataApp:
                 log_callback=self.safe_log,
                 progress_callback=self.safe_progress
             )
+            self.has_financials = any(not df.empty for df in self.financials.values())
             
-            # Fetch closing prices
-            self.closing_prices = fetch_year_end_closing_prices_yf(symbol, years_list)
+            # Collect closing prices
+            self.closing_prices = prices_future.result()
             self.current_symbol = symbol
             
             # Display closing prices
@@ -712,11 +1055,10 @@ class FinancialDataApp:
                 self.safe_log(f"  {y}: {price_str}\n")
             
             # Check if we got any data
-            has_data = any(not df.empty for df in self.financials.values())
-            if has_data:
+            if self.has_financials:
                 self.safe_log(
                     "\n✔️ Financial data successfully extracted!\n"
-                    "Please click 'Export to Excel' to save it locally.\n"
+                    "Please click 'Export' to save it locally.\n"
                 )
             else:
                 self.safe_log(
@@ -738,25 +1080,58 @@ class FinancialDataApp:
         self.enable_inputs()
         self.update_button_states()
     
-    def save_to_excel(self) -> None:
-        """Save analysis results to Excel file."""
-        if self.financials is None or self.current_symbol is None:
+    def export_data(self) -> None:
+        """Save analysis results in the selected export format."""
+        if not self.has_financials or self.current_symbol is None:
             messagebox.showwarning("No Data", "Please run analysis first.")
             return
         
-        self.save_button.configure(state="disabled")
+        self.export_running = True
+        self.update_button_states()
         
-        try:
-            success = save_to_excel(
+        # Write the file in the background so the window stays responsive
+        thread = threading.Thread(
+            target=self.export_thread,
+            args=(
                 self.financials,
                 self.closing_prices or {},
-                self.current_symbol
-            )
-            if success:
-                # Reset analysis state after successful save
-                pass
+                self.current_symbol,
+                self.format_var.get(),
+                self.export_cache
+            ),
+            daemon=True
+        )
+        thread.start()
+    
+    def export_thread(self, financials: Dict[str, pd.DataFrame],
+                      closing_prices: Dict[str, float], symbol: str,
+                      file_format: str,
+                      cache: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]) -> None:
+        """Run the export in a separate thread."""
+        try:
+            if file_format == "xlsx":
+                save_to_excel(
+                    financials,
+                    closing_prices,
+                    symbol,
+                    cache=cache,
+                    message_callback=self.safe_message
+                )
+            else:
+                save_to_columnar(
+                    financials,
+                    closing_prices,
+                    symbol,
+                    file_format=file_format,
+                    message_callback=self.safe_message
+                )
         finally:
-            self.save_button.configure(state="normal")
+            self.root.after(0, self.finalize_export)
+    
+    def finalize_export(self) -> None:
+        """Finalize export and update UI."""
+        self.export_running = False
+        self.update_button_states()
     
     def disable_inputs(self) -> None:
         """Disable input fields during analysis."""
@@ -772,13 +1147,38 @@ class FinancialDataApp:
     
     def safe_log(self, message: str) -> None:
         """Thread-safe logging to text widget."""
-        self.root.after(0, lambda: (
-            self.result_text.insert("end", message),
+        self.log_queue.put(message)
+        with self.log_lock:
+            if self.log_flush_pending:
+                return
+            self.log_flush_pending = True
+        self.root.after(LOG_FLUSH_DELAY_MS, self.flush_log)
+    
+    def flush_log(self) -> None:
+        """Flush queued log messages to the text widget in one update."""
+        with self.log_lock:
+            self.log_flush_pending = False
+        
+        messages = []
+        while True:
+            try:
+                messages.append(self.log_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        if messages:
+            self.result_text.insert("end", "".join(messages))
             self.result_text.see("end")
-        ))
+    
+    def safe_message(self, kind: str, title: str, message: str) -> None:
+        """Thread-safe message box."""
+        self.root.after(0, lambda: show_message(kind, title, message))
     
     def safe_progress(self, value: float) -> None:
-        """Thread-safe progress bar update."""
+        """Thread-safe progress bar update, skipping changes of less than 1%."""
+        if value < 100 and abs(value - self.last_progress) < 1:
+            return
+        self.last_progress = value
         self.root.after(0, lambda: self.progress_bar.set(value / 100))
     
     def open_settings_window(self) -> None:
@@ -848,6 +1248,7 @@ class FinancialDataApp:
                 return
             
             set_api_key(key, validated=True)
+            self.api_key_valid = True
             status_label.configure(text="✔️ API key validated!", text_color="green")
             messagebox.showinfo(
                 "Saved",
@@ -924,9 +1325,16 @@ class FinancialDataApp:
 # ==============================
 def main():
     """Main entry point."""
+    # Clean old cache in the background so it never delays startup
+    threading.Thread(target=clean_old_cache, daemon=True).start()
+    
     root = ctk.CTk()
     app = FinancialDataApp(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        # Let pending fetch threads return so the process can exit
+        shutdown_event.set()
 
 
 if __name__ == "__main__":